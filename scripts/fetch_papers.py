@@ -1,32 +1,61 @@
 #!/usr/bin/env python3
-import urllib.request
+import argparse
 import urllib.parse
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+import functools
+import hashlib
+import heapq
 import json
+import operator
 import re
 import os
 from pathlib import Path
+from typing import TYPE_CHECKING
 
+import orjson
+import requests
 import yaml
 
-try:
-    from openai import OpenAI
-except ImportError:  # 本地环境缺少 openai 包时自动安装
-    import subprocess
-    subprocess.check_call(["pip", "install", "openai"])
+if TYPE_CHECKING:
     from openai import OpenAI
 
 
+_ROOT = Path(__file__).resolve().parent.parent
+_CONFIG_PATH = _ROOT / "config.yaml"
+_DATA = _ROOT / "data"
+_SEEN_PATH = _DATA / "seen_ids.json"
+_SCORES_PATH = _DATA / "scores.json"
+_DS_CACHE_PATH = _DATA / "ds_cache.json"
+_PAPERS_DIR = _DATA / "papers"
+
+_ARXIV_ID_RE = re.compile(r"(\d{4}\.\d{4,5})(?:v\d+)?$")
+_WS_RE = re.compile(r"\s+")
+_SCORE_RE = re.compile(r'"score"\s*:\s*(\d+)')
+
+
+@functools.lru_cache(maxsize=1)
 def load_config():
-    config_path = Path(__file__).parent.parent / "config.yaml"
-    with open(config_path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    # 强制使用 libyaml 的 C 解析器，缺失时直接报错而不是静默退回纯 Python 实现
+    if not yaml.__with_libyaml__:
+        raise RuntimeError("PyYAML is installed without libyaml, reinstall it with libyaml support")
+    with open(_CONFIG_PATH, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=yaml.CSafeLoader)
+
+
+# NOTE: On CI environments (including GitHub Actions), arXiv may return HTTP 406
+# if no explicit User-Agent is provided, so the shared session always sends one.
+# The session also keeps the connection alive and asks for a gzip-compressed feed.
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    "User-Agent": "arxiv-daily-digest/0.1 (+https://github.com/joey-pan/arxiv-daily-digest)",
+    "Accept": "application/atom+xml,application/xml",
+    "Accept-Encoding": "gzip",
+})
 
 
 def fetch_arxiv_papers(categories: list[str], max_results: int = 300) -> list[dict]:
-    # NOTE: On CI environments (including GitHub Actions), arXiv may return HTTP 406
-    # if no explicit User-Agent is provided. We build a Request with headers to avoid that.
     base_url = "http://export.arxiv.org/api/query?"
     
     cat_query = " OR ".join([f"cat:{cat}" for cat in categories])
@@ -44,68 +73,82 @@ def fetch_arxiv_papers(categories: list[str], max_results: int = 300) -> list[di
     
     url = base_url + urllib.parse.urlencode(params)
 
-    headers = {
-        "User-Agent": "arxiv-daily-digest/0.1 (+https://github.com/joey-pan/arxiv-daily-digest)",
-        "Accept": "application/atom+xml,application/xml"
-    }
+    with _SESSION.get(url, timeout=30, stream=True) as response:
+        response.raise_for_status()
+        # 让 urllib3 在读取时透明解压 gzip，iterparse 直接消费解压后的字节流
+        response.raw.decode_content = True
+        return parse_arxiv_stream(response.raw)
 
-    req = urllib.request.Request(url, headers=headers)
 
-    with urllib.request.urlopen(req, timeout=30) as response:
-        xml_data = response.read().decode("utf-8")
-    
-    return parse_arxiv_response(xml_data)
+ARXIV_NS = {"atom": "http://www.w3.org/2005/Atom", "arxiv": "http://arxiv.org/schemas/atom"}
+_ENTRY_TAG = "{http://www.w3.org/2005/Atom}entry"
 
 
-def parse_arxiv_response(xml_data: str) -> list[dict]:
-    root = ET.fromstring(xml_data)
-    ns = {"atom": "http://www.w3.org/2005/Atom", "arxiv": "http://arxiv.org/schemas/atom"}
-    
+def parse_arxiv_stream(fileobj) -> list[dict]:
+    """边下载边解析 Atom feed，每个 <entry> 结束时立即转换为 dict 并释放节点。"""
     papers = []
-    for entry in root.findall("atom:entry", ns):
-        paper = {
-            "id": extract_arxiv_id(entry.find("atom:id", ns).text),
-            "title": clean_text(entry.find("atom:title", ns).text),
-            "abstract": clean_text(entry.find("atom:summary", ns).text),
-            "authors": [a.find("atom:name", ns).text for a in entry.findall("atom:author", ns)],
-            "published": entry.find("atom:published", ns).text[:10],
-            "updated": entry.find("atom:updated", ns).text[:10],
-            "categories": [c.get("term") for c in entry.findall("atom:category", ns)],
-            "pdf_url": f"https://arxiv.org/pdf/{extract_arxiv_id(entry.find('atom:id', ns).text)}.pdf",
-            "abs_url": f"https://arxiv.org/abs/{extract_arxiv_id(entry.find('atom:id', ns).text)}"
-        }
-        
-        primary_cat = entry.find("arxiv:primary_category", ns)
-        if primary_cat is not None:
-            paper["primary_category"] = primary_cat.get("term")
-        else:
-            paper["primary_category"] = paper["categories"][0] if paper["categories"] else ""
-            
-        papers.append(paper)
-    
+    root = None
+    for event, elem in ET.iterparse(fileobj, events=("start", "end")):
+        if root is None:
+            # 第一个 start 事件即 <feed> 根节点
+            root = elem
+        if event != "end" or elem.tag != _ENTRY_TAG:
+            continue
+
+        papers.append(parse_entry(elem))
+        # 清空并从根节点移除已处理的 entry，使内存中的树始终只保留当前 entry
+        elem.clear()
+        root.remove(elem)
+
     return papers
 
 
+def parse_entry(entry: ET.Element) -> dict:
+    ns = ARXIV_NS
+    aid = extract_arxiv_id(entry.find("atom:id", ns).text)
+    paper = {
+        "id": aid,
+        "title": clean_text(entry.find("atom:title", ns).text),
+        "abstract": clean_text(entry.find("atom:summary", ns).text),
+        "authors": [a.find("atom:name", ns).text for a in entry.findall("atom:author", ns)],
+        "published": entry.find("atom:published", ns).text[:10],
+        "updated": entry.find("atom:updated", ns).text[:10],
+        "categories": [c.get("term") for c in entry.findall("atom:category", ns)],
+        "pdf_url": f"https://arxiv.org/pdf/{aid}.pdf",
+        "abs_url": f"https://arxiv.org/abs/{aid}"
+    }
+    
+    primary_cat = entry.find("arxiv:primary_category", ns)
+    if primary_cat is not None:
+        paper["primary_category"] = primary_cat.get("term")
+    else:
+        paper["primary_category"] = paper["categories"][0] if paper["categories"] else ""
+
+    return paper
+
+
 def extract_arxiv_id(url: str) -> str:
-    match = re.search(r"(\d{4}\.\d{4,5})(v\d+)?$", url)
+    match = _ARXIV_ID_RE.search(url)
     return match.group(1) if match else url.split("/")[-1]
 
 
 def clean_text(text: str) -> str:
     if not text:
         return ""
-    text = re.sub(r"\s+", " ", text)
+    text = _WS_RE.sub(" ", text)
     return text.strip()
 
 
-def calculate_relevance(paper: dict, config: dict) -> float:
+def calculate_relevance(paper: dict, config: dict, keywords: list[str] | None = None) -> float:
     score = 0.0
     weights = config.get("relevance_weights", {})
-    keywords = [kw.lower() for kw in config.get("keywords", [])]
+    if keywords is None:
+        keywords = [kw.lower() for kw in config.get("keywords", [])]
     
     title_lower = paper["title"].lower()
     abstract_lower = paper["abstract"].lower()
     
+    # 逐个关键词做子串判断（C 实现），比合并成正则后再回推命中了哪些关键词更快
     for kw in keywords:
         if kw in title_lower:
             score += weights.get("keyword_in_title", 3.0)
@@ -119,47 +162,90 @@ def calculate_relevance(paper: dict, config: dict) -> float:
     return score
 
 
-def filter_papers(papers: list[dict], config: dict) -> list[dict]:
-    """基础时间过滤：仅保留最近 30 天内的论文。
+FILTER_STRATEGIES = ("recent", "keyword")
+
+
+def filter_papers(papers: list[dict], config: dict, strategy: str | None = None) -> list[dict]:
+    """按筛选策略过滤论文，策略默认取自 config["filter_strategy"]。
+
+    - recent（默认）：仅保留最近 30 天内的论文，相关性交给 DeepSeek 打分决定；
+    - keyword：仅保留今天或昨天（UTC）发布、命中关键词且不含排除词的论文。
+    """
+    strategy = strategy or config.get("filter_strategy", "recent")
+    if strategy == "recent":
+        return _filter_recent_days(papers, 30)
+    if strategy == "keyword":
+        return _filter_keyword_recent(papers, config)
+    raise ValueError(f"Unknown filter strategy: {strategy}")
+
+
+def _filter_recent_days(papers: list[dict], days: int) -> list[dict]:
+    """基础时间过滤：仅保留最近 days 天内的论文。
 
-    不再在这里做关键词/领域筛选，交给 DeepSeek 打分决定相关性，
+    不在这里做关键词/领域筛选，交给 DeepSeek 打分决定相关性，
     这样第一次运行会对抓取到的 300 篇全部打分，之后只对新论文打分。
     """
+    # arXiv published 字段格式为 YYYY-MM-DD，可直接按字符串字典序与阈值日期比较
+    threshold_str = (datetime.utcnow() - timedelta(days=days)).strftime("%Y-%m-%d")
+
+    filtered = []
+    for paper in papers:
+        pub_str = paper.get("published")
+        if not pub_str or pub_str < threshold_str:
+            # 缺少发布日期或早于阈值的论文直接跳过
+            continue
 
-    # 仅保留最近 30 天内发布的论文
-    now = datetime.utcnow()
-    threshold = now - timedelta(days=30)
+        filtered.append(paper)
+
+    # 为无 DeepSeek 打分时的回退行为提供一个合理顺序：按发布时间降序
+    filtered.sort(key=lambda x: x.get("published", ""), reverse=True)
+
+    return filtered
+
+
+def _filter_keyword_recent(papers: list[dict], config: dict) -> list[dict]:
+    """关键词过滤：仅保留今天或昨天（UTC）发布、命中至少一个关键词且不含排除词的论文。
+
+    published 只精确到日期，因此按日期比较，实际窗口最长接近 48 小时。
+    """
+    keywords = [kw.lower() for kw in config.get("keywords", [])]
+    excludes = [kw.lower() for kw in config.get("exclude_keywords", [])]
+    threshold_str = (datetime.utcnow() - timedelta(days=1)).strftime("%Y-%m-%d")
 
     filtered = []
     for paper in papers:
-        # arXiv published 字段格式为 YYYY-MM-DD
         pub_str = paper.get("published")
-        try:
-            pub_dt = datetime.strptime(pub_str, "%Y-%m-%d")
-        except Exception:
-            # 无法解析发布日期的论文直接跳过
+        if not pub_str or pub_str < threshold_str:
             continue
 
-        if pub_dt < threshold:
-            # 只看最近 30 天
+        text = (paper["title"] + " " + paper["abstract"]).lower()
+        if any(ex in text for ex in excludes):
+            continue
+        if keywords and not any(kw in text for kw in keywords):
             continue
 
         filtered.append(paper)
 
-    # 为无 DeepSeek 打分时的回退行为提供一个合理顺序：按发布时间降序
-    filtered.sort(key=lambda x: x.get("published", ""), reverse=True)
+    # 无 DeepSeek 打分时按启发式相关性排序
+    filtered.sort(key=lambda x: calculate_relevance(x, config, keywords), reverse=True)
 
     return filtered
 
 
+def write_json_atomic(path: Path, data, option: int = 0) -> None:
+    """先写临时文件再 rename，避免写到一半崩溃时损坏缓存。"""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(orjson.dumps(data, option=option))
+    tmp.replace(path)
+
+
 def load_seen_ids() -> set[str]:
     """载入已推送过的论文 ID 集合，用于避免重复推荐。"""
-    path = Path(__file__).parent.parent / "data" / "seen_ids.json"
+    path = _SEEN_PATH
     if not path.exists():
         return set()
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = orjson.loads(path.read_bytes())
         if isinstance(data, list):
             return set(str(x) for x in data)
     except Exception:
@@ -168,10 +254,9 @@ def load_seen_ids() -> set[str]:
 
 
 def save_seen_ids(seen: set[str]) -> None:
-    path = Path(__file__).parent.parent / "data" / "seen_ids.json"
+    path = _SEEN_PATH
     path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(sorted(seen), f, ensure_ascii=False, indent=2)
+    write_json_atomic(path, sorted(seen))
 
 
 def select_unseen(papers: list[dict], seen: set[str], limit: int) -> tuple[list[dict], set[str]]:
@@ -195,12 +280,11 @@ def select_unseen(papers: list[dict], seen: set[str], limit: int) -> tuple[list[
 
 def load_scores() -> dict[str, int]:
     """载入 DeepSeek 打分缓存，避免重复打分。"""
-    path = Path(__file__).parent.parent / "data" / "scores.json"
+    path = _SCORES_PATH
     if not path.exists():
         return {}
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = orjson.loads(path.read_bytes())
         if isinstance(data, dict):
             # 统一转成 int 分数
             return {str(k): int(v) for k, v in data.items()}
@@ -210,13 +294,45 @@ def load_scores() -> dict[str, int]:
 
 
 def save_scores(scores: dict[str, int]) -> None:
-    path = Path(__file__).parent.parent / "data" / "scores.json"
+    path = _SCORES_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_json_atomic(path, scores, orjson.OPT_SORT_KEYS)
+
+
+def load_ds_cache() -> dict[str, dict]:
+    """载入 DeepSeek 打分的内容缓存：输入内容哈希 -> {"score", "ts"}。"""
+    path = _DS_CACHE_PATH
+    if not path.exists():
+        return {}
+    try:
+        data = orjson.loads(path.read_bytes())
+        if isinstance(data, dict):
+            return data
+    except Exception:
+        return {}
+    return {}
+
+
+def save_ds_cache(cache: dict[str, dict]) -> None:
+    path = _DS_CACHE_PATH
     path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(scores, f, ensure_ascii=False, indent=2)
+    write_json_atomic(path, cache, orjson.OPT_SORT_KEYS)
+
+
+# 超过候选时间窗口的论文不会再被打分，对应的缓存条目可以丢弃，避免缓存文件无限增长
+DS_CACHE_TTL_DAYS = 30
 
 
-RANK_PROMPT_TEMPLATE = """你是一个论文筛选与打分助手，请基于以下信息判断论文是否"高度符合"用户的兴趣。
+def prune_ds_cache(cache: dict[str, dict], days: int = DS_CACHE_TTL_DAYS) -> int:
+    """删除 days 天前写入的缓存条目，返回删除的条数。"""
+    threshold = (datetime.utcnow() - timedelta(days=days)).isoformat(timespec="seconds")
+    stale = [key for key, entry in cache.items() if entry.get("ts", "") < threshold]
+    for key in stale:
+        del cache[key]
+    return len(stale)
+
+
+RANK_PROMPT_HEADER = """你是一个论文筛选与打分助手，请基于以下信息判断论文是否"高度符合"用户的兴趣。
 
 请严格遵循下面的兴趣画像：
 
@@ -231,7 +347,9 @@ RANK_PROMPT_TEMPLATE = """你是一个论文筛选与打分助手，请基于以
 （例如在顶会/领域内经常出现、你非常熟悉的名字），可以适当上调分数（例如 +5~15 分），但总分仍需控制在 0-100 范围内。
 
 请主要依据："是否值得向一名做Graphic Design/Design Intelligence/Layout Generation的研究生重点推荐" 来给出综合分数。
+"""
 
+RANK_PROMPT_TEMPLATE = RANK_PROMPT_HEADER + """
 论文标题: {title}
 
 作者列表: {authors}
@@ -247,6 +365,21 @@ JSON 格式严格如下（注意 score 必须是 0 到 100 之间的整数）：
 }}
 """
 
+RANK_BATCH_PROMPT_TEMPLATE = RANK_PROMPT_HEADER + """
+下面每行是一篇待打分论文的 JSON（字段：id、title、authors、abstract），请对每一篇分别打分：
+
+{papers}
+
+现在请**只输出一个 JSON 对象**，不要输出任何解释文字、不要使用代码块、不要添加额外内容。
+JSON 格式严格如下（id 原样返回为字符串，score 必须是 0 到 100 之间的整数，每篇论文对应一项）：
+
+{{
+  "scores": [
+    {{"id": "论文 id", "score": 0-100}}
+  ]
+}}
+"""
+
 
 def create_ds_client(config: dict):
     api_key = os.environ.get("DEEPSEEK_API_KEY")
@@ -254,21 +387,65 @@ def create_ds_client(config: dict):
         print("[rank] DEEPSEEK_API_KEY not set, skip DeepSeek ranking")
         return None
 
-    ds = config.get("deepseek", {})
+    # openai 导入开销较大，只在确实需要请求 API 时才导入
+    from openai import OpenAI
+
     return OpenAI(
         api_key=api_key,
         base_url="https://api.deepseek.com",
     )
 
 
-def score_with_deepseek(client: OpenAI, paper: dict, config: dict):
+def extract_json_object(content: str) -> str:
+    """去掉可能的代码块包裹和多余说明文本，只保留第一个 JSON 对象。"""
+    if content.startswith("```"):
+        # ```json ... ``` 或 ``` ... ```
+        parts = content.split("```", 2)
+        if len(parts) >= 2:
+            content = parts[1]
+        content = content.lstrip()
+        if content.lower().startswith("json"):
+            # 去掉前缀 json
+            content = content.split("\n", 1)[1] if "\n" in content else ""
+
+    # 抽取第一个 {...} 作为 JSON
+    start = content.find("{")
+    end = content.rfind("}")
+    if start != -1 and end != -1 and end > start:
+        return content[start : end + 1]
+    return content
+
+
+def prompt_fields(paper: dict, config: dict) -> tuple[str, str]:
+    """返回截断后的 (title, abstract)：打分只需摘要开头，截断以控制每次请求的 token 数。"""
+    ds_cfg = config.get("deepseek", {})
+    title = (paper.get("title", "") or "")[: ds_cfg.get("title_char_limit", 300)]
+    abstract = (paper.get("abstract", "") or "")[: ds_cfg.get("abstract_char_limit", 800)]
+    return title, abstract
+
+
+def ds_cache_key(paper: dict, config: dict) -> str:
+    """按 (model, profile, title, abstract) 计算缓存键，输入不变则不重复调用 API。"""
+    model = config.get("deepseek", {}).get("model", "deepseek-chat")
+    profile = config.get("preference", {}).get("profile") or ""
+    title, abstract = prompt_fields(paper, config)
+    raw = f"{model}|{profile}|{title}|{abstract}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def score_with_deepseek(client: "OpenAI", paper: dict, config: dict, cache: dict | None = None):
+    key = ds_cache_key(paper, config)
+    if cache is not None and key in cache:
+        return cache[key]["score"]
+
     profile = config.get("preference", {}).get("profile") or ""
     authors_str = ", ".join(paper.get("authors", []))
+    title, abstract = prompt_fields(paper, config)
     prompt = RANK_PROMPT_TEMPLATE.format(
         profile=profile,
-        title=paper.get("title", ""),
+        title=title,
         authors=authors_str,
-        abstract=paper.get("abstract", ""),
+        abstract=abstract,
     )
 
     ds_cfg = config.get("deepseek", {})
@@ -279,94 +456,176 @@ def score_with_deepseek(client: OpenAI, paper: dict, config: dict):
             max_tokens=64,
             temperature=0.0,
         )
-        content = resp.choices[0].message.content.strip()
-
-        # 处理可能的代码块包裹和多余说明文本，只保留第一个 JSON 对象
-        if content.startswith("```"):
-            # ```json ... ``` 或 ``` ... ```
-            parts = content.split("```", 2)
-            if len(parts) >= 2:
-                content = parts[1]
-            content = content.lstrip()
-            if content.lower().startswith("json"):
-                # 去掉前缀 json
-                content = content.split("\n", 1)[1] if "\n" in content else ""
-
-        # 抽取第一个 {...} 作为 JSON
-        start = content.find("{")
-        end = content.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            json_str = content[start : end + 1]
-        else:
-            json_str = content
+        content = resp.choices[0].message.content
 
-        data = json.loads(json_str)
-        score = int(data.get("score", 0))
+        # 直接用正则取出 score，不受模型在 JSON 前后附加说明或代码块的影响；取不到再按 JSON 解析
+        m = _SCORE_RE.search(content)
+        if m:
+            score = int(m.group(1))
+        else:
+            data = json.loads(extract_json_object(content.strip()))
+            score = int(data.get("score", 0))
         # clamp
         score = max(0, min(100, score))
+        if cache is not None:
+            cache[key] = {"score": score, "ts": datetime.utcnow().isoformat(timespec="seconds")}
         return score
     except Exception as e:
         print(f"[rank] DeepSeek scoring failed for {paper.get('id')}: {e}")
         return None
 
 
-def save_papers(papers: list[dict], date_str: str):
-    data_dir = Path(__file__).parent.parent / "data" / "papers"
+def score_batch_with_deepseek(
+    client: "OpenAI", papers: list[dict], config: dict, cache: dict | None = None
+) -> dict[str, int]:
+    """一次请求为多篇论文打分，返回 id -> score。
+
+    已有缓存的论文不再发送；批量结果解析失败或缺少某篇时，退回单篇打分。
+    """
+    results: dict[str, int] = {}
+    pending: list[tuple[dict, str]] = []
+    for paper in papers:
+        key = ds_cache_key(paper, config)
+        if cache is not None and key in cache:
+            results[paper["id"]] = cache[key]["score"]
+        else:
+            pending.append((paper, key))
+
+    if not pending:
+        return results
+
+    batch_scores: dict[str, int] = {}
+    if len(pending) > 1:
+        profile = config.get("preference", {}).get("profile") or ""
+        items = []
+        for paper, _ in pending:
+            title, abstract = prompt_fields(paper, config)
+            items.append(json.dumps(
+                {
+                    "id": paper["id"],
+                    "title": title,
+                    "authors": ", ".join(paper.get("authors", [])),
+                    "abstract": abstract,
+                },
+                ensure_ascii=False,
+            ))
+        prompt = RANK_BATCH_PROMPT_TEMPLATE.format(profile=profile, papers="\n".join(items))
+
+        ds_cfg = config.get("deepseek", {})
+        try:
+            resp = client.chat.completions.create(
+                model=ds_cfg.get("model", "deepseek-chat"),
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=32 * len(pending),
+                temperature=0.0,
+            )
+            content = resp.choices[0].message.content.strip()
+
+            data = json.loads(extract_json_object(content))
+            for item in data.get("scores", []):
+                batch_scores[str(item["id"])] = max(0, min(100, int(item["score"])))
+        except Exception as e:
+            print(f"[rank] DeepSeek batch scoring failed for {len(pending)} papers, retry one by one: {e}")
+            batch_scores = {}
+
+    ts = datetime.utcnow().isoformat(timespec="seconds")
+    for paper, key in pending:
+        pid = paper["id"]
+        if pid in batch_scores:
+            results[pid] = batch_scores[pid]
+            if cache is not None:
+                cache[key] = {"score": batch_scores[pid], "ts": ts}
+            continue
+        s = score_with_deepseek(client, paper, config, cache)
+        if s is not None:
+            results[pid] = s
+
+    return results
+
+
+def save_papers(papers: list[dict], date_str: str, pretty: bool = False):
+    data_dir = _PAPERS_DIR
     data_dir.mkdir(parents=True, exist_ok=True)
     
     output_file = data_dir / f"{date_str}.json"
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(papers, f, ensure_ascii=False, indent=2)
+    write_json_atomic(output_file, papers, orjson.OPT_INDENT_2 if pretty else 0)
     
     print(f"Saved {len(papers)} papers to {output_file}")
     return output_file
 
 
-def main():
+def main(strategy: str | None = None, today: str | None = None):
     config = load_config()
+    strategy = strategy or config.get("filter_strategy", "recent")
     
     print(f"Fetching papers from categories: {config['categories']}")
-    all_papers = fetch_arxiv_papers(config["categories"])
+    all_papers = fetch_arxiv_papers(config["categories"], config.get("max_results", 300))
     print(f"Fetched {len(all_papers)} papers from arXiv")
 
-    base_filtered = filter_papers(all_papers, config)
-    print(f"Filtered to {len(base_filtered)} candidates in last 30 days")
+    base_filtered = filter_papers(all_papers, config, strategy)
+    print(f"Filtered to {len(base_filtered)} candidates (strategy={strategy})")
 
     # 加载历史打分和已推送 ID
     scores = load_scores()
+    ds_cache = load_ds_cache()
     seen = load_seen_ids()
     limit = config.get("max_papers_per_day", 5)
 
     client = create_ds_client(config)
 
-    # 仅对未打分论文调用 DeepSeek 打分
+    pruned = prune_ds_cache(ds_cache)
+
+    # 以内容缓存决定哪些论文需要打分：模型或兴趣画像改动后缓存键随之变化，相关论文会重新打分
     if client is not None:
+        todo = [p for p in base_filtered if p.get("id") and ds_cache_key(p, config) not in ds_cache]
+        # 打分请求是纯网络等待，用有界线程池并发发出；max_workers 同时限制了
+        # 同一时刻在途的 DeepSeek 请求数
+        ds_cfg = config.get("deepseek", {})
+        concurrency = max(1, int(ds_cfg.get("concurrency", 8)))
+        batch_size = max(1, int(ds_cfg.get("batch_size", 10)))
+        batches = [todo[i : i + batch_size] for i in range(0, len(todo), batch_size)]
         new_scores = 0
-        for paper in base_filtered:
-            pid = paper.get("id")
-            if not pid or pid in scores:
-                continue
-            s = score_with_deepseek(client, paper, config)
-            if s is not None:
-                scores[pid] = s
-                new_scores += 1
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [pool.submit(score_batch_with_deepseek, client, b, config, ds_cache) for b in batches]
+            for future in as_completed(futures):
+                batch_scores = future.result()
+                new_scores += len(batch_scores)
+                # 每批完成就落盘，中途崩溃后重跑可直接复用已打的分
+                if batch_scores:
+                    save_ds_cache(ds_cache)
         if new_scores:
             print(f"Scored {new_scores} new papers with DeepSeek")
-            save_scores(scores)
         else:
             print("No new papers to score with DeepSeek")
     else:
         print("DeepSeek client not available, fallback to heuristic relevance only")
 
-    # 根据 DeepSeek 分数（或启发式分数）排序
-    def paper_score(p: dict) -> float:
-        pid = p.get("id")
-        if pid in scores:
-            return float(scores[pid])
-        # 没有 DeepSeek 分数时退回到 0，由 filter_papers 的时间排序提供基础顺序
-        return 0.0
-
-    ranked = sorted(base_filtered, key=paper_score, reverse=True)
+    if pruned:
+        print(f"Pruned {pruned} DeepSeek cache entries older than {DS_CACHE_TTL_DAYS} days")
+        save_ds_cache(ds_cache)
+
+    # scores.json 是内容缓存的 id -> score 视图，由当前候选论文的缓存条目刷新
+    updated = 0
+    for p in base_filtered:
+        entry = ds_cache.get(ds_cache_key(p, config))
+        if p.get("id") and entry is not None and scores.get(p["id"]) != entry["score"]:
+            scores[p["id"]] = entry["score"]
+            updated += 1
+    if updated:
+        save_scores(scores)
+
+    # 根据 DeepSeek 分数排序：先一次性取出分数组成 (score, i, paper)，避免排序时反复查字典；
+    # 没有 DeepSeek 分数时退回到 0，由 filter_papers 的时间排序提供基础顺序
+    scored = [(float(scores.get(p.get("id"), 0.0)), i, p) for i, p in enumerate(base_filtered)]
+
+    # select_unseen 只会用到前 limit 篇可推送论文，因此只需取前 limit + 不可推送数 篇，
+    # 用 heapq.nlargest 代替全量排序（结果与 sorted(...)[:need] 完全一致）
+    skipped = sum(1 for p in base_filtered if not p.get("id") or p["id"] in seen)
+    if skipped == len(base_filtered):
+        ranked = []
+    else:
+        top = heapq.nlargest(limit + skipped, scored, key=operator.itemgetter(0))
+        ranked = [paper for _, _, paper in top]
 
     # 从排好序的列表中选出未推送过的 top-K
     today_papers, new_seen = select_unseen(ranked, seen, limit)
@@ -378,8 +637,8 @@ def main():
         if pid in scores:
             p["score"] = scores[pid]
 
-    today = datetime.now().strftime("%Y-%m-%d")
-    output_file = save_papers(today_papers, today)
+    today = today or datetime.now().strftime("%Y-%m-%d")
+    output_file = save_papers(today_papers, today, pretty=config.get("pretty_output", False))
 
     if new_seen:
         updated_seen = seen.union(new_seen)
@@ -392,4 +651,12 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Fetch and rank arXiv papers")
+    parser.add_argument(
+        "--strategy",
+        choices=FILTER_STRATEGIES,
+        default=None,
+        help="filter strategy, overrides filter_strategy in config.yaml",
+    )
+    args = parser.parse_args()
+    main(strategy=args.strategy)
@@ -1,15 +1,28 @@
 #!/usr/bin/env python3
+import functools
+import hashlib
+import io
 import json
+from collections import Counter
 from pathlib import Path
 from datetime import datetime
 import yaml
 import shutil
 
+_ROOT = Path(__file__).resolve().parent.parent
+_CONFIG_PATH = _ROOT / "config.yaml"
+_PAPERS_DIR = _ROOT / "data" / "papers"
+_PUBLIC_DIR = _ROOT / "public"
+_SCRIPT_PATH = Path(__file__).resolve()
 
+
+@functools.lru_cache(maxsize=1)
 def load_config():
-    config_path = Path(__file__).parent.parent / "config.yaml"
-    with open(config_path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    # 强制使用 libyaml 的 C 解析器，缺失时直接报错而不是静默退回纯 Python 实现
+    if not yaml.__with_libyaml__:
+        raise RuntimeError("PyYAML is installed without libyaml, reinstall it with libyaml support")
+    with open(_CONFIG_PATH, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=yaml.CSafeLoader)
 
 
 CATEGORY_NAMES = {
@@ -26,71 +39,12 @@ CATEGORY_NAMES = {
 }
 
 
-def generate_paper_html(paper: dict) -> str:
-    summary = paper.get("summary", {})
-    title_zh = summary.get("title_zh", "")
-
-    authors_str = ", ".join(paper["authors"][:5])
-    if len(paper["authors"]) > 5:
-        authors_str += f" 等 ({len(paper['authors'])} 位作者)"
-
-    cat_name = CATEGORY_NAMES.get(paper.get("primary_category", ""), paper.get("primary_category", ""))
-    score = paper.get("score")
-
-    score_html = f'<span class="score-badge">相关性 {int(score)}/100</span>' if isinstance(score, (int, float)) else ""
-
-    return f'''
-    <article class="paper-card">
-      <div class="paper-header">
-        <div class="left-header">
-          <span class="category-badge">{cat_name}</span>
-          <span class="paper-id">{paper["id"]}</span>
-        </div>
-        {score_html}
-      </div>
-      <h3 class="paper-title">
-        <a href="{paper["abs_url"]}" target="_blank">{paper["title"]}</a>
-      </h3>
-      {f'<p class="paper-title-zh">{title_zh}</p>' if title_zh else ''}
-      <p class="paper-authors">{authors_str}</p>
-      
-      <div class="paper-summary">
-        {f'<div class="summary-section"><strong>核心贡献:</strong> {summary.get("core_contribution", "")}</div>' if summary.get("core_contribution") else ''}
-        {f'<div class="summary-section"><strong>方法:</strong> {summary.get("method", "")}</div>' if summary.get("method") else ''}
-        {f'<div class="summary-section"><strong>关键发现:</strong> {summary.get("findings", "")}</div>' if summary.get("findings") else ''}
-      </div>
-      
-      <details class="paper-abstract">
-        <summary>查看原文摘要</summary>
-        <p>{paper["abstract"]}</p>
-      </details>
-      
-      <div class="paper-links">
-        <a href="{paper["abs_url"]}" target="_blank" class="link-btn">📄 arXiv</a>
-        <a href="{paper["pdf_url"]}" target="_blank" class="link-btn">📥 PDF</a>
-      </div>
-    </article>
-    '''
-
-
-def generate_index_html(papers: list[dict], date_str: str, config: dict) -> str:
-    site_config = config.get("site", {})
-    
-    papers_html = "\n".join([generate_paper_html(p) for p in papers])
-    
-    cat_counts = {}
-    for p in papers:
-        cat = p.get("primary_category", "other")
-        cat_counts[cat] = cat_counts.get(cat, 0) + 1
-    
-    stats_html = " | ".join([f"{CATEGORY_NAMES.get(k, k)}: {v}" for k, v in sorted(cat_counts.items())])
-    
-    return f'''<!DOCTYPE html>
+_INDEX_TEMPLATE = '''<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{site_config.get("title", "ArXiv Daily Digest")}</title>
+    <title>{page_title}</title>
     <link rel="preconnect" href="https://fonts.googleapis.com">
     <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600&family=Noto+Sans+SC:wght@400;500;600&display=swap" rel="stylesheet">
     <style>
@@ -310,10 +264,10 @@ def generate_index_html(papers: list[dict], date_str: str, config: dict) -> str:
 </head>
 <body>
     <header>
-        <h1>{site_config.get("title", "📚 ArXiv Daily Digest")}</h1>
-        <p class="subtitle">{site_config.get("description", "每日论文精选")}</p>
+        <h1>{heading}</h1>
+        <p class="subtitle">{description}</p>
         <p class="date">📅 {date_str}</p>
-        <p class="stats">共 {len(papers)} 篇论文 | {stats_html}</p>
+        <p class="stats">共 {paper_count} 篇论文 | {stats_html}</p>
         <p class="archive-link-top"><a href="archive.html">查看历史归档 →</a></p>
     </header>
     
@@ -329,6 +283,94 @@ def generate_index_html(papers: list[dict], date_str: str, config: dict) -> str:
 </html>'''
 
 
+def generate_paper_html(paper: dict) -> str:
+    summary = paper.get("summary") or {}
+    get = summary.get
+    title_zh = get("title_zh", "")
+    core_contribution = get("core_contribution")
+    method = get("method")
+    findings = get("findings")
+
+    authors = paper["authors"]
+    authors_str = ", ".join(authors[:5])
+    if len(authors) > 5:
+        authors_str += f" 等 ({len(authors)} 位作者)"
+
+    primary_category = paper.get("primary_category", "")
+    cat_name = CATEGORY_NAMES.get(primary_category, primary_category)
+    score = paper.get("score")
+    abs_url = paper["abs_url"]
+
+    score_html = f'<span class="score-badge">相关性 {int(score)}/100</span>' if isinstance(score, (int, float)) else ""
+
+    parts = [
+        f'''
+    <article class="paper-card">
+      <div class="paper-header">
+        <div class="left-header">
+          <span class="category-badge">{cat_name}</span>
+          <span class="paper-id">{paper["id"]}</span>
+        </div>
+        {score_html}
+      </div>
+      <h3 class="paper-title">
+        <a href="{abs_url}" target="_blank">{paper["title"]}</a>
+      </h3>
+      ''',
+        f'<p class="paper-title-zh">{title_zh}</p>' if title_zh else "",
+        f'''
+      <p class="paper-authors">{authors_str}</p>
+      
+      <div class="paper-summary">
+        ''',
+        f'<div class="summary-section"><strong>核心贡献:</strong> {core_contribution}</div>' if core_contribution else "",
+        "\n        ",
+        f'<div class="summary-section"><strong>方法:</strong> {method}</div>' if method else "",
+        "\n        ",
+        f'<div class="summary-section"><strong>关键发现:</strong> {findings}</div>' if findings else "",
+        f'''
+      </div>
+      
+      <details class="paper-abstract">
+        <summary>查看原文摘要</summary>
+        <p>{paper["abstract"]}</p>
+      </details>
+      
+      <div class="paper-links">
+        <a href="{abs_url}" target="_blank" class="link-btn">📄 arXiv</a>
+        <a href="{paper["pdf_url"]}" target="_blank" class="link-btn">📥 PDF</a>
+      </div>
+    </article>
+    ''',
+    ]
+    return "".join(parts)
+
+
+def generate_index_html(papers: list[dict], date_str: str, config: dict) -> str:
+    site_config = config.get("site", {})
+    
+    buf = io.StringIO()
+    for i, p in enumerate(papers):
+        if i:
+            buf.write("\n")
+        buf.write(generate_paper_html(p))
+    papers_html = buf.getvalue()
+    
+    cat_counts = Counter(p.get("primary_category", "other") for p in papers)
+    
+    stats_html = " | ".join([f"{CATEGORY_NAMES.get(k, k)}: {v}" for k, v in sorted(cat_counts.items())])
+    
+    return _INDEX_TEMPLATE.format_map({
+        "page_title": site_config.get("title", "ArXiv Daily Digest"),
+        "heading": site_config.get("title", "📚 ArXiv Daily Digest"),
+        "description": site_config.get("description", "每日论文精选"),
+        "date_str": date_str,
+        "paper_count": len(papers),
+        "stats_html": stats_html,
+        "papers_html": papers_html,
+    })
+
+
 def generate_archive_html(all_dates: list[str], config: dict) -> str:
     site_config = config.get("site", {})
     
@@ -386,30 +428,64 @@ def generate_archive_html(all_dates: list[str], config: dict) -> str:
 </html>'''
 
 
-def main():
+def inputs_fingerprint() -> str:
+    """config.yaml 与本脚本（模板）内容的摘要，任一改动都需要重新生成页面。"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(_CONFIG_PATH.read_bytes())
+    h.update(_SCRIPT_PATH.read_bytes())
+    return h.hexdigest()
+
+
+def main(today: str | None = None):
     config = load_config()
-    project_root = Path(__file__).parent.parent
-    data_dir = project_root / "data" / "papers"
-    output_dir = project_root / "public"
+    data_dir = _PAPERS_DIR
+    output_dir = _PUBLIC_DIR
     
     output_dir.mkdir(exist_ok=True)
     
-    today = datetime.now().strftime("%Y-%m-%d")
+    today = today or datetime.now().strftime("%Y-%m-%d")
     today_file = data_dir / f"{today}.json"
     
+    index_file = output_dir / "index.html"
+    today_html = output_dir / f"{today}.html"
     if today_file.exists():
-        with open(today_file, "r", encoding="utf-8") as f:
-            papers = json.load(f)
-        
-        index_html = generate_index_html(papers, today, config)
-        (output_dir / "index.html").write_text(index_html, encoding="utf-8")
-        (output_dir / f"{today}.html").write_text(index_html, encoding="utf-8")
-        print(f"Generated index.html with {len(papers)} papers")
+        # 当日 JSON、config.yaml 与模板自上次生成页面后均未修改，则跳过重新渲染
+        inputs_mtime = max(
+            today_file.stat().st_mtime,
+            _CONFIG_PATH.stat().st_mtime,
+            _SCRIPT_PATH.stat().st_mtime,
+        )
+        if (
+            index_file.exists()
+            and today_html.exists()
+            and today_html.stat().st_mtime >= inputs_mtime
+        ):
+            print(f"{today_html.name} is up to date, skip regenerating index.html")
+        else:
+            with open(today_file, "r", encoding="utf-8") as f:
+                papers = json.load(f)
+
+            index_html = generate_index_html(papers, today, config)
+            index_file.write_text(index_html, encoding="utf-8")
+            today_html.write_text(index_html, encoding="utf-8")
+            print(f"Generated index.html with {len(papers)} papers")
     
-    all_dates = [f.stem for f in data_dir.glob("*.json")]
-    archive_html = generate_archive_html(all_dates, config)
-    (output_dir / "archive.html").write_text(archive_html, encoding="utf-8")
-    print(f"Generated archive.html with {len(all_dates)} dates")
+    all_dates = sorted((f.stem for f in data_dir.glob("*.json")), reverse=True)
+    # 归档页只依赖日期列表、配置和模板，与上次记录的清单一致时无需重写
+    archive_file = output_dir / "archive.html"
+    manifest_file = output_dir / ".archive_manifest"
+    manifest = "\n".join([inputs_fingerprint(), *all_dates])
+    if (
+        archive_file.exists()
+        and manifest_file.exists()
+        and manifest_file.read_text(encoding="utf-8") == manifest
+    ):
+        print(f"archive.html is up to date ({len(all_dates)} dates)")
+    else:
+        archive_html = generate_archive_html(all_dates, config)
+        archive_file.write_text(archive_html, encoding="utf-8")
+        manifest_file.write_text(manifest, encoding="utf-8")
+        print(f"Generated archive.html with {len(all_dates)} dates")
 
 
 if __name__ == "__main__":
@@ -1,17 +1,26 @@
 #!/usr/bin/env python3
-import json
+import functools
 import os
 from datetime import datetime
 from pathlib import Path
-from urllib import parse, request
+from urllib.parse import quote_from_bytes
 
+import orjson
+import urllib3
 import yaml
 
+_ROOT = Path(__file__).resolve().parent.parent
+_CONFIG_PATH = _ROOT / "config.yaml"
+_PAPERS_DIR = _ROOT / "data" / "papers"
 
+
+@functools.lru_cache(maxsize=1)
 def load_config() -> dict:
-    config_path = Path(__file__).parent.parent / "config.yaml"
-    with open(config_path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    # 强制使用 libyaml 的 C 解析器，缺失时直接报错而不是静默退回纯 Python 实现
+    if not yaml.__with_libyaml__:
+        raise RuntimeError("PyYAML is installed without libyaml, reinstall it with libyaml support")
+    with open(_CONFIG_PATH, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=yaml.CSafeLoader)
 
 
 def get_today_str() -> str:
@@ -19,13 +28,11 @@ def get_today_str() -> str:
 
 
 def get_paper_count(today: str) -> int:
-    data_dir = Path(__file__).parent.parent / "data" / "papers"
-    file_path = data_dir / f"{today}.json"
+    file_path = _PAPERS_DIR / f"{today}.json"
     if not file_path.exists():
         return 0
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = orjson.loads(file_path.read_bytes())
         if isinstance(data, list):
             return len(data)
         return 0
@@ -47,14 +54,25 @@ def resolve_site_url(config: dict) -> str:
     return ""
 
 
+# 复用同一连接池：保持 TLS 连接，重试时无需重新握手
+_POOL = urllib3.PoolManager(maxsize=1, retries=urllib3.Retry(total=2, backoff_factor=0.2))
+
+
 def send_serverchan(key: str, title: str, desp: str) -> None:
     url = f"https://sctapi.ftqq.com/{key}.send"
-    payload = parse.urlencode({"title": title, "desp": desp}).encode("utf-8")
-    req = request.Request(url, data=payload, method="POST")
-    req.add_header("Content-Type", "application/x-www-form-urlencoded;charset=utf-8")
+    # 只有两个字段，直接拼出表单字节串，省去 urlencode 的字典遍历和逐字符 quote_plus
+    payload = (
+        b"title=" + quote_from_bytes(title.encode("utf-8"), safe=b"").encode("ascii")
+        + b"&desp=" + quote_from_bytes(desp.encode("utf-8"), safe=b"").encode("ascii")
+    )
+    headers = {
+        "Content-Type": "application/x-www-form-urlencoded;charset=utf-8",
+        "Accept-Encoding": "gzip",
+    }
     try:
-        with request.urlopen(req, timeout=10) as resp:
-            resp.read()
+        resp = _POOL.request("POST", url, body=payload, headers=headers, timeout=10)
+        if resp.status >= 400:
+            print(f"[notify_wechat] send failed: HTTP {resp.status}")
     except Exception as e:
         print(f"[notify_wechat] send failed: {e}")
 
@@ -1,32 +1,40 @@
 #!/usr/bin/env python3
-import subprocess
 import sys
-from pathlib import Path
+import traceback
+from datetime import datetime
 
-SCRIPTS_DIR = Path(__file__).parent
+import fetch_papers
+import generate_pages
+import summarize
 
 
-def run_script(name: str) -> bool:
-    script_path = SCRIPTS_DIR / name
+def run_step(name: str, step) -> bool:
     print(f"\n{'='*50}")
     print(f"Running: {name}")
     print('='*50)
     
-    result = subprocess.run([sys.executable, str(script_path)], cwd=SCRIPTS_DIR.parent)
-    return result.returncode == 0
+    try:
+        step()
+    except Exception:
+        traceback.print_exc()
+        return False
+    return True
 
 
 def main():
+    # 各步骤在同一进程内直接调用，config / yaml / openai 只需导入和解析一次
+    # 日期只在这里取一次并传给各步骤，运行跨过午夜时也读写同一天的文件
+    today = datetime.now().strftime("%Y-%m-%d")
     steps = [
-        ("fetch_papers.py", "Fetching papers from arXiv..."),
-        ("summarize.py", "Generating AI summaries..."),
-        ("generate_pages.py", "Building HTML pages...")
+        ("fetch_papers.py", lambda: fetch_papers.main(today=today), "Fetching papers from arXiv..."),
+        ("summarize.py", lambda: summarize.main(today=today), "Generating AI summaries..."),
+        ("generate_pages.py", lambda: generate_pages.main(today=today), "Building HTML pages...")
     ]
     
-    for script, description in steps:
+    for name, step, description in steps:
         print(f"\n🚀 {description}")
-        if not run_script(script):
-            print(f"❌ Failed at: {script}")
+        if not run_step(name, step):
+            print(f"❌ Failed at: {name}")
             sys.exit(1)
     
     print("\n" + "="*50)
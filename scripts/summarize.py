@@ -1,32 +1,63 @@
 #!/usr/bin/env python3
+import asyncio
+import functools
+import hashlib
 import json
+import logging
 import os
-import time
 from pathlib import Path
 from datetime import datetime
+from typing import TYPE_CHECKING
+import orjson
 import yaml
+from aiolimiter import AsyncLimiter
 
-try:
-    from openai import OpenAI
-except ImportError:
-    print("Installing openai package...")
-    import subprocess
-    subprocess.check_call(["pip", "install", "openai"])
-    from openai import OpenAI
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
 
 
+logger = logging.getLogger("summarize")
+
+_ROOT = Path(__file__).resolve().parent.parent
+_CONFIG_PATH = _ROOT / "config.yaml"
+_PAPERS_DIR = _ROOT / "data" / "papers"
+_CACHE_DIR = _ROOT / "data" / "cache" / "summaries"
+
+# DeepSeek 单次请求的输出 token 上限
+MAX_OUTPUT_TOKENS = 8192
+
+# 每完成多少篇总结就落盘一次，崩溃时最多只需重做这么多篇
+CHECKPOINT_EVERY = 5
+
+
+def save_atomic(path: Path, data, pretty: bool = False) -> None:
+    """先写临时文件再 os.replace，保证磁盘上的文件始终是完整的 JSON。"""
+    option = orjson.OPT_APPEND_NEWLINE
+    if pretty:
+        option |= orjson.OPT_INDENT_2
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_bytes(orjson.dumps(data, option=option))
+    os.replace(tmp, path)
+
+
+@functools.lru_cache(maxsize=1)
 def load_config():
-    config_path = Path(__file__).parent.parent / "config.yaml"
-    with open(config_path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    # 强制使用 libyaml 的 C 解析器，缺失时直接报错而不是静默退回纯 Python 实现
+    if not yaml.__with_libyaml__:
+        raise RuntimeError("PyYAML is installed without libyaml, reinstall it with libyaml support")
+    with open(_CONFIG_PATH, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=yaml.CSafeLoader)
 
 
-def create_client(config: dict) -> OpenAI:
+def create_client(config: dict) -> "AsyncOpenAI":
     api_key = os.environ.get("DEEPSEEK_API_KEY")
     if not api_key:
         raise ValueError("DEEPSEEK_API_KEY environment variable not set")
+
+    # openai 导入开销较大，只在确实需要请求 API 时才导入
+    from openai import AsyncOpenAI
     
-    return OpenAI(
+    return AsyncOpenAI(
         api_key=api_key,
         base_url="https://api.deepseek.com"
     )
@@ -44,7 +75,7 @@ SUMMARY_PROMPT = """你是一个学术论文总结助手。请用中文总结以
 论文摘要:
 {abstract}
 
-请用以下JSON格式返回(确保是有效JSON):
+只输出一个JSON对象,不要输出其他内容,格式如下:
 {{
     "title_zh": "中文标题",
     "core_contribution": "核心贡献描述",
@@ -53,85 +84,237 @@ SUMMARY_PROMPT = """你是一个学术论文总结助手。请用中文总结以
 }}"""
 
 
-def summarize_paper(client: OpenAI, paper: dict, config: dict) -> dict:
+SUMMARY_BATCH_PROMPT = """你是一个学术论文总结助手。请用中文分别总结下面的每一篇论文,每篇包含:
+
+1. **标题翻译**: 将英文标题翻译成中文
+2. **核心贡献**: 用1-2句话概括论文的主要贡献
+3. **方法概述**: 简要描述所用方法(3-4句)
+4. **关键发现**: 主要实验结果或结论
+
+下面每行是一篇论文的JSON(字段: id、title、abstract):
+{papers}
+
+只输出一个JSON对象,不要输出其他内容,results 中每篇论文对应一项,id 原样返回,格式如下:
+{{
+    "results": [
+        {{
+            "id": "论文 id",
+            "title_zh": "中文标题",
+            "core_contribution": "核心贡献描述",
+            "method": "方法概述",
+            "findings": "关键发现"
+        }}
+    ]
+}}"""
+
+
+def _unescape_braces(text: str) -> str:
+    return text.replace("{{", "{").replace("}}", "}")
+
+
+# 模板在导入时拆成三段，每篇论文只需拼接字符串，不必每次重新解析 format 占位符
+_P1, _rest = SUMMARY_PROMPT.split("{title}")
+_P2, _P3 = _rest.split("{abstract}")
+_P1, _P2, _P3 = (_unescape_braces(part) for part in (_P1, _P2, _P3))
+del _rest
+_B1, _B2 = (_unescape_braces(part) for part in SUMMARY_BATCH_PROMPT.split("{papers}"))
+
+
+def summary_cache_path(paper: dict, config: dict) -> Path:
+    """按 (model, paper id, abstract) 计算内容地址的缓存文件路径。"""
+    model = config.get("deepseek", {}).get("model", "deepseek-chat")
+    raw = f"{model}|{paper['id']}|{paper['abstract']}".encode("utf-8")
+    return _CACHE_DIR / f"{hashlib.blake2b(raw, digest_size=16).hexdigest()}.json"
+
+
+# 一份完整的总结必须包含的字段；缺任一字段都视为失败，既不缓存也不写入论文
+SUMMARY_FIELDS = ("title_zh", "core_contribution", "method", "findings")
+
+
+def is_complete_summary(summary) -> bool:
+    return isinstance(summary, dict) and all(field in summary for field in SUMMARY_FIELDS)
+
+
+def load_cached_summary(cache_path: Path) -> dict | None:
+    if not cache_path.exists():
+        return None
+    try:
+        cached = orjson.loads(cache_path.read_bytes())
+    except Exception:
+        # 缓存文件损坏时忽略，重新请求
+        return None
+    # 早期写入的空或不完整缓存同样视为未命中
+    return cached if is_complete_summary(cached) else None
+
+
+async def summarize_paper(client: "AsyncOpenAI", paper: dict, config: dict, limiter: AsyncLimiter) -> dict:
     ds_config = config.get("deepseek", {})
+
+    cache_path = summary_cache_path(paper, config)
+    cached = load_cached_summary(cache_path)
+    if cached is not None:
+        return cached
     
-    prompt = SUMMARY_PROMPT.format(
-        title=paper["title"],
-        abstract=paper["abstract"]
-    )
+    prompt = f"{_P1}{paper['title']}{_P2}{paper['abstract']}{_P3}"
     
     try:
-        response = client.chat.completions.create(
-            model=ds_config.get("model", "deepseek-chat"),
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=ds_config.get("max_tokens", 500),
-            temperature=ds_config.get("temperature", 0.3)
-        )
-        
-        content = response.choices[0].message.content.strip()
+        async with limiter:
+            response = await client.chat.completions.create(
+                model=ds_config.get("model", "deepseek-chat"),
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=ds_config.get("max_tokens", 500),
+                temperature=ds_config.get("temperature", 0.3),
+                # JSON 模式下模型只返回 JSON 对象，不再需要剥离代码块
+                response_format={"type": "json_object"},
+            )
         
-        if content.startswith("```"):
-            content = content.split("```")[1]
-            if content.startswith("json"):
-                content = content[4:]
-        
-        summary = json.loads(content)
+        summary = json.loads(response.choices[0].message.content)
+        if not is_complete_summary(summary):
+            logger.warning("Incomplete summary for paper %s, not cached", paper["id"])
+            return None
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        save_atomic(cache_path, summary)
         return summary
         
     except json.JSONDecodeError:
-        return {
-            "title_zh": paper["title"],
-            "core_contribution": "摘要生成失败",
-            "method": "",
-            "findings": ""
-        }
+        # 返回 None 而不是占位总结：论文保持未总结状态，下次运行会重新请求
+        logger.warning("Undecodable summary for paper %s, will retry next run", paper["id"])
+        return None
     except Exception as e:
-        print(f"Error summarizing paper {paper['id']}: {e}")
+        logger.warning("Error summarizing paper %s: %s", paper["id"], e)
         return None
 
 
-def process_papers(papers_file: str):
+async def summarize_batch(
+    client: "AsyncOpenAI", papers: list[dict], config: dict, limiter: AsyncLimiter
+) -> dict[str, dict]:
+    """一次请求总结多篇论文，返回 id -> summary。
+
+    已有缓存的论文不再发送；批量结果解析失败或缺少某篇时，退回单篇总结。
+    每次 API 请求（包括单篇回退）都各自占用一个限速配额。
+    """
+    ds_config = config.get("deepseek", {})
+    results: dict[str, dict] = {}
+    pending: list[tuple[dict, Path]] = []
+    for paper in papers:
+        cache_path = summary_cache_path(paper, config)
+        cached = load_cached_summary(cache_path)
+        if cached is not None:
+            results[paper["id"]] = cached
+        else:
+            pending.append((paper, cache_path))
+
+    batch_results: dict[str, dict] = {}
+    if len(pending) > 1:
+        items = "\n".join(
+            json.dumps({"id": p["id"], "title": p["title"], "abstract": p["abstract"]}, ensure_ascii=False)
+            for p, _ in pending
+        )
+        max_tokens = min(ds_config.get("max_tokens", 500) * len(pending), MAX_OUTPUT_TOKENS)
+        try:
+            async with limiter:
+                response = await client.chat.completions.create(
+                    model=ds_config.get("model", "deepseek-chat"),
+                    messages=[{"role": "user", "content": f"{_B1}{items}{_B2}"}],
+                    max_tokens=max_tokens,
+                    temperature=ds_config.get("temperature", 0.3),
+                    response_format={"type": "json_object"},
+                )
+            data = json.loads(response.choices[0].message.content)
+            for item in data.get("results", []):
+                # 只接受字段齐全的条目，其余论文走单篇回退
+                if is_complete_summary(item):
+                    batch_results[str(item.get("id", ""))] = {field: item[field] for field in SUMMARY_FIELDS}
+        except Exception as e:
+            logger.warning("Batch summarization failed for %d papers, retry one by one: %s", len(pending), e)
+            batch_results = {}
+
+    for paper, cache_path in pending:
+        summary = batch_results.get(paper["id"])
+        if summary is not None:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            save_atomic(cache_path, summary)
+        else:
+            summary = await summarize_paper(client, paper, config, limiter)
+        if summary:
+            results[paper["id"]] = summary
+
+    return results
+
+
+async def process_papers(papers_file: str):
     config = load_config()
     
-    with open(papers_file, "r", encoding="utf-8") as f:
-        papers = json.load(f)
+    path = Path(papers_file)
+    papers = orjson.loads(path.read_bytes())
     
     if not papers:
-        print("No papers to summarize")
+        logger.info("No papers to summarize")
         return
+
+    todo = [p for p in papers if not p.get("summary")]
+    if len(todo) < len(papers):
+        logger.info("Skipping %d already summarized papers", len(papers) - len(todo))
+    if not todo:
+        logger.info("All papers already summarized")
+        return
+    total = len(todo)
+    # 默认写紧凑 JSON，需要人工对比时在 config.yaml 中打开 pretty_output
+    pretty = config.get("pretty_output", False)
     
-    client = create_client(config)
-    
-    for i, paper in enumerate(papers):
-        if "summary" in paper and paper["summary"]:
-            print(f"Skipping already summarized: {paper['id']}")
-            continue
-            
-        print(f"[{i+1}/{len(papers)}] Summarizing: {paper['title'][:60]}...")
-        
-        summary = summarize_paper(client, paper, config)
-        if summary:
-            paper["summary"] = summary
-        
-        time.sleep(0.5)
+    ds_config = config.get("deepseek", {})
+    # 信号量限制同时在处理的批次数，AsyncLimiter 在每次 API 请求处按每分钟请求数限速
+    sem = asyncio.Semaphore(max(1, int(ds_config.get("concurrency", 8))))
+    limiter = AsyncLimiter(ds_config.get("rpm", 120), 60)
+    # 每次请求打包多篇论文，摊薄提示词中固定说明部分的 token 开销
+    batch_size = max(1, int(ds_config.get("summary_batch_size", 5)))
+    # 批次过大时输出会超过单次请求的 token 上限被截断，整批失败后只能逐篇回退
+    max_batch = max(1, MAX_OUTPUT_TOKENS // ds_config.get("max_tokens", 500))
+    if batch_size > max_batch:
+        logger.warning(
+            "summary_batch_size=%d exceeds the %d-token output limit, using %d",
+            batch_size, MAX_OUTPUT_TOKENS, max_batch,
+        )
+        batch_size = max_batch
+    batches = [todo[i : i + batch_size] for i in range(0, total, batch_size)]
+    completed = 0
+    saved = 0
+
+    async def bounded(i: int, batch: list[dict]) -> None:
+        nonlocal completed, saved
+        async with sem:
+            # 并发下逐批输出意义不大，只输出首批、每 10 批和最后一批的进度
+            if i == 1 or i % 10 == 0 or i == len(batches):
+                logger.info("[%d/%d] Summarizing %d papers: %s...", i, len(batches), len(batch), batch[0]["title"][:60])
+            summaries = await summarize_batch(client, batch, config, limiter)
+        for paper in batch:
+            if paper["id"] in summaries:
+                paper["summary"] = summaries[paper["id"]]
+                completed += 1
+        # save_atomic 是同步调用，事件循环中不会与其他协程交错，无需额外加锁
+        if completed - saved >= CHECKPOINT_EVERY:
+            save_atomic(path, papers, pretty)
+            saved = completed
+
+    async with create_client(config) as client:
+        await asyncio.gather(*(bounded(i, batch) for i, batch in enumerate(batches, 1)))
     
-    with open(papers_file, "w", encoding="utf-8") as f:
-        json.dump(papers, f, ensure_ascii=False, indent=2)
+    save_atomic(path, papers, pretty)
     
-    print(f"Summarization complete. Updated {papers_file}")
+    logger.info("Summarization complete. Updated %s", papers_file)
 
 
-def main():
-    today = datetime.now().strftime("%Y-%m-%d")
-    papers_file = Path(__file__).parent.parent / "data" / "papers" / f"{today}.json"
+def main(today: str | None = None):
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    today = today or datetime.now().strftime("%Y-%m-%d")
+    papers_file = _PAPERS_DIR / f"{today}.json"
     
     if not papers_file.exists():
-        print(f"Papers file not found: {papers_file}")
-        print("Run fetch_papers.py first")
+        logger.info("Papers file not found: %s", papers_file)
+        logger.info("Run fetch_papers.py first")
         return
     
-    process_papers(str(papers_file))
+    asyncio.run(process_papers(str(papers_file)))
 
 
 if __name__ == "__main__":